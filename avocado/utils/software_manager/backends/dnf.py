@@ -19,7 +19,7 @@ class DnfBackend(YumBackend):
         """
         super().__init__(cmd="dnf")
 
-    def build_dep(self, name):  # pylint: disable=W0221
+    def build_dep(self, name):
         """
         Install build-dependencies for package [name]
 
@@ -33,3 +33,5 @@ class DnfBackend(YumBackend):
         except process.CmdError as details:
             log.error(details)
             return False
+        finally:
+            self._installed_cache.clear()
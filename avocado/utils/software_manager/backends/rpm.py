@@ -1,6 +1,7 @@
 import logging
 import os
 import re
+import shlex
 
 from avocado.utils import path as utils_path
 from avocado.utils import process
@@ -68,6 +69,31 @@ class RpmBackend(BaseBackend):
             except process.CmdError:
                 return False
 
+    def check_installed_many(self, names):
+        """
+        Check which of the packages in [names] are installed, querying the
+        rpm database only once.
+
+        :param names: Package names.
+        :type names: list of str
+        :returns: the names of the packages that are not installed
+        :rtype: list of str
+        """
+        if not names:
+            return []
+        cmd = self.lowlevel_base_cmd + " -q " + shlex.join(names)
+        # The messages are parsed, so they must not be translated
+        result = process.run(
+            cmd, verbose=False, ignore_status=True, env={"LC_ALL": "C"}
+        )
+        not_installed = re.findall(
+            r"^package (\S+) is not installed$", result.stdout_text, re.MULTILINE
+        )
+        if result.exit_status != 0 and not not_installed:
+            # rpm failed for another reason, check the packages one by one
+            return [name for name in names if not self.check_installed(name)]
+        return [name for name in names if name in not_installed]
+
     def list_all(self, software_components=True):
         """
         List all installed packages.
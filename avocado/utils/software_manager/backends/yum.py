@@ -2,8 +2,10 @@ import configparser
 import logging
 import os
 import re
+import shlex
 import shutil
 import tempfile
+import threading
 
 from avocado.utils import data_factory
 from avocado.utils import path as utils_path
@@ -20,6 +22,31 @@ else:
 
 log = logging.getLogger("avocado.utils.software_manager")
 
+#: Matches a "major.minor.patch" version string
+_VER_RE = re.compile(r"\d+\.\d+\.\d+")
+
+#: Buffer size used when writing the repository configuration, large enough
+#: for the whole file to be written with a single system call
+_WRITE_BUFFER_SIZE = 65536
+
+#: YumBase instance shared by all the yum backends
+_SHARED_YUM_BASE = None
+_SHARED_YUM_BASE_LOCK = threading.Lock()
+
+
+def _get_shared_yum_base():
+    """
+    Returns the shared YumBase instance, creating it on first use.
+
+    Creating a YumBase opens the rpm database and the metadata of every
+    repository, so it is done only once per process.
+    """
+    global _SHARED_YUM_BASE  # pylint: disable=W0603
+    with _SHARED_YUM_BASE_LOCK:
+        if _SHARED_YUM_BASE is None:
+            _SHARED_YUM_BASE = yum.YumBase()
+        return _SHARED_YUM_BASE
+
 
 class YumBackend(RpmBackend):
     """
@@ -33,29 +60,67 @@ class YumBackend(RpmBackend):
     #: Path to the repository managed by Avocado
     REPO_FILE_PATH = "/etc/yum.repos.d/avocado-managed.repo"
 
+    #: Path and version of the package manager, keyed by command name
+    _CMD_CACHE = {}
+
     def __init__(self, cmd="yum"):
         """
         Initializes the base command and the yum package repository.
         """
         super().__init__()
         self.cmd = cmd
-        self.base_command = f"{utils_path.find_command(cmd)} -y "
+        if cmd not in self._CMD_CACHE:
+            self._set_version(cmd)
+        cmd_path, self.pm_version = self._CMD_CACHE[cmd]
+        self.base_argv = [cmd_path, "-y"]
+        self.base_command = shlex.join(self.base_argv) + " "
+        # Read-only queries can rely on the cached metadata, while operations
+        # that change the system state (install, upgrade...) keep using
+        # base_command so the metadata is refreshed when needed
+        self.readonly_command = self.base_command + "-C "
         self._cfgparser = None
-        self._set_version(cmd)
+        self._baseurl_index = None
+        #: Results of the plain "is [name] installed" queries
+        self._installed_cache = {}
         self._yum_base = None
 
     @property
     def repo_config_parser(self):
         if self._cfgparser is None:
             self._cfgparser = configparser.ConfigParser()
-            self._cfgparser.read(self.REPO_FILE_PATH)
+            # Read the whole file at once, missing or unreadable files are
+            # ignored, just like ConfigParser.read() does
+            try:
+                with open(self.REPO_FILE_PATH, "rb") as repo_file:
+                    content = bytearray(os.fstat(repo_file.fileno()).st_size)
+                    size = repo_file.readinto(content)
+            except OSError:
+                pass
+            else:
+                self._cfgparser.read_string(
+                    content[:size].decode("utf-8"), source=self.REPO_FILE_PATH
+                )
         return self._cfgparser
 
+    @property
+    def baseurl_index(self):
+        """
+        Mapping of the managed repositories base URLs to the list of the
+        section names using them.
+        """
+        if self._baseurl_index is None:
+            parser = self.repo_config_parser
+            self._baseurl_index = {}
+            for section in parser.sections():
+                baseurl = parser.get(section, "baseurl", fallback=None)
+                self._baseurl_index.setdefault(baseurl, []).append(section)
+        return self._baseurl_index
+
     @property
     def yum_base(self):
         if self._yum_base is None:
             if HAS_YUM_MODULE:
-                self._yum_base = yum.YumBase()
+                self._yum_base = _get_shared_yum_base()
             else:
                 log.debug(
                     "%s module for Python is required to use the "
@@ -67,48 +132,200 @@ class YumBackend(RpmBackend):
         return self._yum_base
 
     @staticmethod
-    def _cleanup():
+    def _cleanup(full=False):
         """
         Clean up the yum cache so new package information can be downloaded.
+
+        Only the expired metadata is dropped by default.  The yum Python API
+        is used only when running as root, since it can not elevate the
+        privileges needed to touch the cache.
+
+        :param full: wipe the whole cache, including packages and metadata
+                     that are still valid
+        :type full: bool
         """
-        process.system("yum clean all", sudo=True)
+        if full:
+            process.system("yum clean all", sudo=True)
+        elif HAS_YUM_MODULE and os.geteuid() == 0:
+            _get_shared_yum_base().cleanExpireCache()
+        else:
+            process.system("yum clean expire-cache", sudo=True)
 
-    def _set_version(self, cmd):
+    @classmethod
+    def _set_version(cls, cmd):
+        """
+        Finds the command and its version, and caches them in
+        :attr:`_CMD_CACHE`.
+        """
+        cmd_path = utils_path.find_command(cmd)
         result = process.run(
-            self.base_command + "--version", verbose=False, ignore_status=True
+            shlex.join([cmd_path, "-y", "-C", "--version"]),
+            verbose=False,
+            ignore_status=True,
         )
-        first_line = result.stdout_text.splitlines()[0].strip()
-        try:
-            ver = re.findall(r"\d*.\d*.\d*", first_line)[0]
-        except IndexError:
-            ver = first_line
-        self.pm_version = ver
-        log.debug("%s version: %s", cmd, self.pm_version)
+        first_line = result.stdout_text.partition("\n")[0].strip()
+        match = _VER_RE.search(first_line)
+        ver = match.group(0) if match else first_line
+        cls._CMD_CACHE[cmd] = (cmd_path, ver)
+        log.debug("%s version: %s", cmd, ver)
 
-    def install(self, name):
+    def check_installed(self, name, version=None, arch=None):
         """
-        Installs package [name]. Handles local installs.
+        Check if package [name] is installed.
+
+        Results of queries without [version] and [arch] are cached until
+        packages are installed, upgraded or removed through this backend.
+
+        :param name: Package name.
+        :param version: Package version.
+        :param arch: Package architecture.
+        """
+        if version or arch:
+            return super().check_installed(name, version, arch)
+        if name not in self._installed_cache:
+            self._installed_cache[name] = super().check_installed(name)
+        return self._installed_cache[name]
+
+    def check_installed_many(self, names):
         """
-        i_cmd = self.base_command + "install" + " " + name
+        Check which of the packages in [names] are installed, querying the
+        rpm database only for the packages not checked before.
 
+        :param names: Package names.
+        :type names: list of str
+        :returns: the names of the packages that are not installed
+        :rtype: list of str
+        """
+        unknown = [name for name in names if name not in self._installed_cache]
+        if unknown:
+            not_installed = super().check_installed_many(unknown)
+            for name in unknown:
+                self._installed_cache[name] = name not in not_installed
+        return [name for name in names if not self._installed_cache[name]]
+
+    def _run_argv(self, args):
+        """
+        Runs the package manager with [args] and elevated privileges.
+
+        :param args: Arguments given to the package manager.
+        :type args: list of str
+        :returns: whether the command succeeded
+        :rtype: bool
+        """
         try:
-            process.system(i_cmd, sudo=True)
+            process.system(shlex.join(self.base_argv + args), sudo=True)
             return True
         except process.CmdError:
             return False
 
+    def rpm_install(
+        self, file_path, no_dependencies=False, replace=False
+    ):  # pylint: disable=W0221
+        """
+        Install the rpm file [file_path] provided.
+
+        :param str file_path: file path of the installed package
+        :param bool no_dependencies: whether to add "nodeps" flag
+        :param bool replace: whether to replace existing package
+        :returns: whether file is installed properly
+        :rtype: bool
+        """
+        try:
+            return super().rpm_install(file_path, no_dependencies, replace)
+        finally:
+            self._installed_cache.clear()
+
+    def rpm_erase(self, package_name):  # pylint: disable=W0221
+        """
+        Erase an RPM package.
+
+        :param str package_name: name of the erased package
+        :returns: whether file is erased properly
+        :rtype: bool
+        """
+        try:
+            return super().rpm_erase(package_name)
+        finally:
+            self._installed_cache.clear()
+
+    def install(self, name):
+        """
+        Installs package [name]. Handles local installs.
+        """
+        return self.install_many(shlex.split(name))
+
+    def install_many(self, names):
+        """
+        Installs all packages in [names] with a single transaction.
+
+        :param names: Package names (eg. ['rpm-build', 'yum-utils']).
+        :type names: list of str
+        """
+        result = self._run_argv(["install"] + names)
+        # Whatever the result, packages (and their dependencies) may have
+        # been installed, by this or by another process
+        self._installed_cache.clear()
+        return result
+
     def remove(self, name):
         """
         Removes package [name].
 
         :param name: Package name (eg. 'ipython').
         """
-        r_cmd = self.base_command + "erase" + " " + name
-        try:
-            process.system(r_cmd, sudo=True)
-            return True
-        except process.CmdError:
+        return self.remove_many(shlex.split(name))
+
+    def remove_many(self, names):
+        """
+        Removes all packages in [names] with a single transaction.
+
+        :param names: Package names (eg. ['ipython', 'ipython3']).
+        :type names: list of str
+        """
+        if not self._run_argv(["erase"] + names):
             return False
+        # Packages depending on [names] may have been removed as well
+        self._installed_cache.clear()
+        return True
+
+    def _write_repo_config(self):
+        """
+        Writes the repository configuration into :attr:`REPO_FILE_PATH`.
+
+        The file is written next to its destination and atomically renamed
+        over it.  If the repository directory is not writable by the current
+        user, the content is copied over the existing file, using elevated
+        privileges only when that file is not writable either.
+        """
+        prefix = "avocado_software_manager"
+        try:
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=prefix, dir=os.path.dirname(self.REPO_FILE_PATH)
+            )
+        except PermissionError:
+            with tempfile.NamedTemporaryFile(
+                "w", prefix=prefix, buffering=_WRITE_BUFFER_SIZE
+            ) as tmp_file:
+                self.repo_config_parser.write(tmp_file, space_around_delimiters=False)
+                tmp_file.flush()  # Sync the content
+                try:
+                    shutil.copyfile(tmp_file.name, self.REPO_FILE_PATH)
+                except PermissionError:
+                    process.system(
+                        f"cp {tmp_file.name} {self.REPO_FILE_PATH}", sudo=True
+                    )
+            return
+        try:
+            with os.fdopen(fd, "w", buffering=_WRITE_BUFFER_SIZE) as repo_file:
+                os.fchmod(fd, 0o644)
+                self.repo_config_parser.write(repo_file, space_around_delimiters=False)
+                repo_file.flush()
+                os.fsync(fd)
+            os.replace(tmp_path, self.REPO_FILE_PATH)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
 
     def add_repo(self, url, **opt_params):
         """
@@ -121,10 +338,8 @@ class YumBackend(RpmBackend):
         repo_options = {"enabled": "1", "gpgcheck": "0"}
         repo_options.update(opt_params)
         # Check if we URL is already set
-        for section in self.repo_config_parser.sections():
-            for option, value in self.repo_config_parser.items(section):
-                if option == "baseurl" and value == url:
-                    return True
+        if url in self.baseurl_index:
+            return True
 
         # Didn't find it, let's set it up
         while True:
@@ -140,11 +355,8 @@ class YumBackend(RpmBackend):
             self.repo_config_parser.set(section_name, "baseurl", url)
             for opt_key, opt_value in repo_options.items():
                 self.repo_config_parser.set(section_name, opt_key, opt_value)
-            prefix = "avocado_software_manager"
-            with tempfile.NamedTemporaryFile("w", prefix=prefix) as tmp_file:
-                self.repo_config_parser.write(tmp_file, space_around_delimiters=False)
-                tmp_file.flush()  # Sync the content
-                process.system(f"cp {tmp_file.name} {self.REPO_FILE_PATH}", sudo=True)
+            self.baseurl_index[url] = [section_name]
+            self._write_repo_config()
             return True
         except (OSError, process.CmdError) as details:
             log.error(details)
@@ -156,19 +368,15 @@ class YumBackend(RpmBackend):
 
         :param url: Universal Resource Locator of the repository.
         """
+        sections = self.baseurl_index.get(url)
+        if sections is None:
+            return True
         try:
-            prefix = "avocado_software_manager"
-            with tempfile.NamedTemporaryFile("w", prefix=prefix) as tmp_file:
-                for section in self.repo_config_parser.sections():
-                    for option, value in self.repo_config_parser.items(section):
-                        if option == "baseurl" and value == url:
-                            self.repo_config_parser.remove_section(section)
-                self.repo_config_parser.write(
-                    tmp_file.file, space_around_delimiters=False
-                )
-                tmp_file.flush()  # Sync the content
-                process.system(f"cp {tmp_file.name} {self.REPO_FILE_PATH}", sudo=True)
-                return True
+            for section in sections:
+                self.repo_config_parser.remove_section(section)
+            del self.baseurl_index[url]
+            self._write_repo_config()
+            return True
         except (OSError, process.CmdError) as details:
             log.error(details)
             return False
@@ -183,15 +391,12 @@ class YumBackend(RpmBackend):
         :type name: str
         """
         if not name:
-            r_cmd = self.base_command + "update"
+            result = self._run_argv(["update"])
         else:
-            r_cmd = self.base_command + "update" + " " + name
-
-        try:
-            process.system(r_cmd, sudo=True)
-            return True
-        except process.CmdError:
-            return False
+            result = self._run_argv(["update"] + shlex.split(name))
+        # Upgrades may obsolete packages or pull in new dependencies
+        self._installed_cache.clear()
+        return result
 
     def provides(self, name):
         """
@@ -220,8 +425,7 @@ class YumBackend(RpmBackend):
         else:
             return None
 
-    @staticmethod
-    def build_dep(name):
+    def build_dep(self, name):
         """
         Install build-dependencies for package [name]
 
@@ -236,6 +440,8 @@ class YumBackend(RpmBackend):
         except process.CmdError as details:
             log.error(details)
             return False
+        finally:
+            self._installed_cache.clear()
 
     def get_source(self, name, dest_path, build_option=None):
         """
@@ -253,27 +459,31 @@ class YumBackend(RpmBackend):
             if dest_path is None:
                 log.error("Please provide a valid path")
                 return ""
-            for pkg in ["rpm-build", "yum-utils"]:
-                if not self.check_installed(pkg):
-                    if not self.install(pkg):
-                        log.error(
-                            "SoftwareManager (YumBackend) can't get "
-                            "packageswith dependency resolution: Package"
-                            " '%s' could not be installed",
-                            pkg,
-                        )
-                        return ""
+            missing = self.check_installed_many(["rpm-build", "yum-utils"])
+            if missing and not self.install_many(missing):
+                log.error(
+                    "SoftwareManager (YumBackend) can't get "
+                    "packages with dependency resolution: Packages"
+                    " '%s' could not be installed",
+                    "', '".join(missing),
+                )
+                return ""
             try:
                 process.run(
                     f"yumdownloader --assumeyes --verbose "
                     f"--source {name} --destdir {path}"
                 )
-                src_rpms = [_ for _ in next(os.walk(path))[2] if _.endswith(".src.rpm")]
+                with os.scandir(path) as entries:
+                    src_rpms = [
+                        entry.name
+                        for entry in entries
+                        if entry.is_file() and entry.name.endswith(".src.rpm")
+                    ]
                 if len(src_rpms) != 1:
                     log.error(
                         "Failed to get downloaded src.rpm from %s:\n%s",
                         path,
-                        next(os.walk(path))[2],
+                        src_rpms,
                     )
                     return ""
                 if self.rpm_install(os.path.join(path, src_rpms[-1])):
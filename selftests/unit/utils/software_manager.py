@@ -1,9 +1,10 @@
 import os
 import unittest
+import unittest.mock
 
-from avocado.utils import distro
+from avocado.utils import distro, process
 from avocado.utils.software_manager import backends, manager
-from selftests.utils import BASEDIR, setup_avocado_loggers
+from selftests.utils import BASEDIR, TestCaseTmpDir, setup_avocado_loggers
 
 setup_avocado_loggers()
 
@@ -34,5 +35,214 @@ class Dpkg(unittest.TestCase):
         self.assertFalse(dpkg.is_valid(not_deb_path))
 
 
+class Yum(TestCaseTmpDir):
+    def setUp(self):
+        super().setUp()
+        self.repo_path = os.path.join(self.tmpdir.name, "avocado-managed.repo")
+        with open(self.repo_path, "w", encoding="utf-8") as repo_file:
+            repo_file.write(
+                "[software_manager_abcd]\n"
+                "name=Avocado managed repository\n"
+                "baseurl=http://example.com/repo\n"
+                "enabled=1\n"
+            )
+        version = process.CmdResult("yum --version", stdout=b"4.14.0\n")
+        self.run_mock = unittest.mock.Mock(return_value=version)
+        patches = [
+            unittest.mock.patch(
+                "avocado.utils.path.find_command", side_effect=lambda cmd: cmd
+            ),
+            unittest.mock.patch("avocado.utils.process.run", self.run_mock),
+            unittest.mock.patch.dict(backends.yum.YumBackend._CMD_CACHE, clear=True),
+            unittest.mock.patch.object(
+                backends.yum.YumBackend, "REPO_FILE_PATH", self.repo_path
+            ),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.yum = backends.yum.YumBackend()
+
+    def test_command_cache(self):
+        self.assertEqual(self.yum.base_command, "yum -y ")
+        self.assertEqual(self.yum.readonly_command, "yum -y -C ")
+        self.assertEqual(self.yum.pm_version, "4.14.0")
+        self.run_mock.assert_called_once_with(
+            "yum -y -C --version", verbose=False, ignore_status=True
+        )
+        backends.yum.YumBackend()
+        self.assertEqual(self.run_mock.call_count, 1)
+
+    def test_command_path_with_spaces(self):
+        with unittest.mock.patch(
+            "avocado.utils.path.find_command", return_value="/opt/my tools/dnf"
+        ):
+            dnf = backends.yum.YumBackend("dnf")
+        self.assertEqual(dnf.base_argv, ["/opt/my tools/dnf", "-y"])
+        self.run_mock.assert_called_with(
+            "'/opt/my tools/dnf' -y -C --version", verbose=False, ignore_status=True
+        )
+        with unittest.mock.patch("avocado.utils.process.system") as system_mock:
+            self.assertTrue(dnf.install("gcc"))
+            system_mock.assert_called_once_with(
+                "'/opt/my tools/dnf' -y install gcc", sudo=True
+            )
+
+    def test_version(self):
+        self.run_mock.return_value = process.CmdResult(
+            "dnf --version", stdout=b"dnf5 version 5.0.6\ndnf5 plugin API version\n"
+        )
+        self.assertEqual(backends.yum.YumBackend("dnf").pm_version, "5.0.6")
+
+    def test_check_installed_many(self):
+        self.run_mock.return_value = process.CmdResult(
+            "rpm -q rpm-build yum-utils",
+            stdout=b"rpm-build-4.18.0-1.fc37.x86_64\n"
+            b"package yum-utils is not installed\n",
+            exit_status=1,
+        )
+        self.assertEqual(
+            self.yum.check_installed_many(["rpm-build", "yum-utils"]), ["yum-utils"]
+        )
+        self.run_mock.assert_called_with(
+            "rpm -q rpm-build yum-utils",
+            verbose=False,
+            ignore_status=True,
+            env={"LC_ALL": "C"},
+        )
+
+    def test_check_installed_many_empty(self):
+        self.assertEqual(self.yum.check_installed_many([]), [])
+        self.assertEqual(self.run_mock.call_count, 1)
+
+    def test_check_installed_many_rpm_error(self):
+        self.run_mock.return_value = process.CmdResult(
+            "rpm -q rpm-build yum-utils", stdout=b"", exit_status=1
+        )
+        with unittest.mock.patch(
+            "avocado.utils.process.system",
+            side_effect=[None, process.CmdError("rpm -q yum-utils")],
+        ):
+            self.assertEqual(
+                self.yum.check_installed_many(["rpm-build", "yum-utils"]),
+                ["yum-utils"],
+            )
+
+    def test_check_installed_cache(self):
+        self.run_mock.return_value = process.CmdResult(
+            "rpm -q rpm-build yum-utils",
+            stdout=b"package rpm-build is not installed\n"
+            b"package yum-utils is not installed\n",
+            exit_status=1,
+        )
+        self.yum.check_installed_many(["rpm-build", "yum-utils"])
+        with unittest.mock.patch("avocado.utils.process.system") as system_mock:
+            self.assertFalse(self.yum.check_installed("yum-utils"))
+            system_mock.assert_not_called()
+            # yum-utils is pulled in as a dependency of rpm-build
+            self.assertTrue(self.yum.install("rpm-build"))
+            self.assertTrue(self.yum.check_installed("yum-utils"))
+            self.assertEqual(self.yum.check_installed_many(["yum-utils"]), [])
+            self.assertEqual(
+                system_mock.call_args_list,
+                [
+                    unittest.mock.call("yum -y install rpm-build", sudo=True),
+                    unittest.mock.call("rpm -q yum-utils"),
+                ],
+            )
+        self.assertEqual(self.run_mock.call_count, 2)
+
+    def test_check_installed_after_perform_setup(self):
+        rpm_path = os.path.join(self.tmpdir.name, "foo-1.0-1.noarch.rpm")
+        with open(rpm_path, "wb"):
+            pass
+        with unittest.mock.patch(
+            "avocado.utils.process.system",
+            side_effect=[process.CmdError("rpm -q foo"), None, None],
+        ) as system_mock:
+            self.assertFalse(self.yum.check_installed("foo"))
+            self.assertTrue(self.yum.perform_setup([rpm_path]))
+            self.assertTrue(self.yum.check_installed("foo"))
+            self.assertEqual(
+                system_mock.call_args_list,
+                [
+                    unittest.mock.call("rpm -q foo"),
+                    unittest.mock.call(f"rpm -i {rpm_path}"),
+                    unittest.mock.call("rpm -q foo"),
+                ],
+            )
+
+    def test_check_installed_after_failed_install(self):
+        with unittest.mock.patch(
+            "avocado.utils.process.system",
+            side_effect=[
+                process.CmdError("rpm -q gcc"),
+                process.CmdError("yum -y install gcc"),
+                None,
+            ],
+        ) as system_mock:
+            self.assertFalse(self.yum.check_installed("gcc"))
+            self.assertFalse(self.yum.install("gcc"))
+            self.assertTrue(self.yum.check_installed("gcc"))
+            self.assertEqual(system_mock.call_count, 3)
+
+    def test_install_many(self):
+        with unittest.mock.patch("avocado.utils.process.system") as system_mock:
+            self.assertTrue(self.yum.install_many(["rpm-build", "yum-utils"]))
+            system_mock.assert_called_once_with(
+                "yum -y install rpm-build yum-utils", sudo=True
+            )
+
+    def test_install_several(self):
+        with unittest.mock.patch("avocado.utils.process.system") as system_mock:
+            self.assertTrue(self.yum.install("gcc 'make'"))
+            system_mock.assert_called_once_with("yum -y install gcc make", sudo=True)
+
+    def test_baseurl_index(self):
+        self.assertEqual(
+            self.yum.baseurl_index,
+            {"http://example.com/repo": ["software_manager_abcd"]},
+        )
+
+    def test_add_repo_existing(self):
+        with unittest.mock.patch("avocado.utils.process.system") as system_mock:
+            self.assertTrue(self.yum.add_repo("http://example.com/repo"))
+            system_mock.assert_not_called()
+
+    def test_add_remove_repo(self):
+        url = "http://example.com/other"
+        with unittest.mock.patch("avocado.utils.process.system") as system_mock:
+            self.assertTrue(self.yum.add_repo(url))
+            self.assertTrue(self.yum.remove_repo("http://example.com/repo"))
+            system_mock.assert_not_called()
+        with open(self.repo_path, encoding="utf-8") as repo_file:
+            content = repo_file.read()
+        self.assertIn(f"baseurl={url}", content)
+        self.assertNotIn("baseurl=http://example.com/repo", content)
+        self.assertEqual(os.listdir(self.tmpdir.name), ["avocado-managed.repo"])
+
+    def test_remove_repo_duplicated(self):
+        with open(self.repo_path, "a", encoding="utf-8") as repo_file:
+            repo_file.write("[manual]\nbaseurl=http://example.com/repo\n")
+        self.assertTrue(self.yum.remove_repo("http://example.com/repo"))
+        with open(self.repo_path, encoding="utf-8") as repo_file:
+            self.assertEqual(repo_file.read(), "")
+
+    def test_remove_repo_missing(self):
+        mtime = os.stat(self.repo_path).st_mtime_ns
+        with unittest.mock.patch("tempfile.mkstemp") as mkstemp_mock:
+            self.assertTrue(self.yum.remove_repo("http://example.com/missing"))
+            mkstemp_mock.assert_not_called()
+        self.assertEqual(os.stat(self.repo_path).st_mtime_ns, mtime)
+
+    def test_remove_repo_readonly_dir(self):
+        with unittest.mock.patch("tempfile.mkstemp", side_effect=PermissionError):
+            with unittest.mock.patch("avocado.utils.process.system") as system_mock:
+                self.assertTrue(self.yum.remove_repo("http://example.com/repo"))
+                system_mock.assert_not_called()
+        with open(self.repo_path, encoding="utf-8") as repo_file:
+            self.assertEqual(repo_file.read(), "")
+
+
 if __name__ == "__main__":
     unittest.main()